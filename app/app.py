@@ -1,35 +1,75 @@
 import os
 import json
+import time
+import queue
+import atexit
+import random
+import threading
+import functools
+from collections import deque
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-
-import pytz
-from flask import Flask, jsonify, render_template, request
+from zoneinfo import ZoneInfo
+
+import gspread
+import orjson
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.triggers.cron import CronTrigger
+from flask import Flask, Response, render_template, request
+from google.auth.transport.requests import AuthorizedSession
+from google.oauth2.service_account import Credentials
+from gspread.exceptions import APIError
+from gspread.utils import absolute_range_name
+from requests.adapters import HTTPAdapter, Retry
 
 # =========================
 # CONFIG
 # =========================
-TZ = pytz.timezone("Asia/Jerusalem")
+TZ = ZoneInfo("Asia/Jerusalem")
 
 TIMER_COUNT = 2
 FIRST_HOUR = 8
 LAST_HOUR = 23          # 23 = 23:00–24:00
 RESET_HOUR = 5
 
+# DAILY_SYNC=1: השעות נאספות בזיכרון ונכתבות לגיליון פעם אחת
+# ב-LAST_HOUR (או ב-/api/flush, במעבר יום ובכיבוי) במקום כל שעה
+DAILY_SYNC = os.getenv("DAILY_SYNC") == "1"
+
+DATE_ROW = 3            # שורת התאריך
+FIRST_ROW = 7           # השורה של FIRST_HOUR
+FIRST_COL = 2           # עמודת טיימר 1 (B)
+
 SPREADSHEET_NAME = "Time Tracking"
 WORKSHEET_NAME = "Log"
+STATE_SHEET_NAME = "_state"
+STATE_RANGE = absolute_range_name(STATE_SHEET_NAME, "A2")
+GS_CALLS_PER_MINUTE = 50    # מתחת למכסה של 60 בדקה
+GS_MAX_ATTEMPTS = 5
+GS_TIMEOUT = (5, 30)     # (התחברות, קריאה) בשניות – שום קריאה לא נתקעת לנצח
+STATE_PATH = os.getenv("STATE_PATH", "/tmp/wt_state.json")
+STATE_SAVE_DELAY = 2.0      # איחוד שינויים רצופים לכתיבת קובץ אחת
+STATE_MIRROR_SECONDS = 300  # גיבוי המצב לגיליון _state
+STATUS_CACHE_SECONDS = 0.5
+STARTUP_WAIT_SECONDS = 10   # כמה בקשה שצריכה את המצב מחכה לעלייה
 
 # =========================
 # FLASK
 # =========================
 app = Flask(__name__, template_folder="templates")
 
+# הדף סטטי – מרנדרים פעם אחת בעלייה
+with app.app_context():
+    _INDEX_HTML = render_template("index.html").encode("utf-8")
+
 # =========================
 # GOOGLE SHEETS
 # =========================
-def gs_connect():
-    import gspread
-    from google.oauth2.service_account import Credentials
+_GS_CACHE = {"gc": None, "sh": None}
+_gs_lock = threading.Lock()
 
+@functools.lru_cache(maxsize=1)
+def _creds():
     raw = os.getenv("GOOGLE_CREDS_JSON")
     if not raw:
         raise RuntimeError("Missing GOOGLE_CREDS_JSON")
@@ -39,21 +79,285 @@ def gs_connect():
         "https://www.googleapis.com/auth/spreadsheets",
         "https://www.googleapis.com/auth/drive",
     ]
-    creds = Credentials.from_service_account_info(info, scopes=scopes)
-    gc = gspread.authorize(creds)
+    return Credentials.from_service_account_info(info, scopes=scopes)
+
+def _gs_session():
+    # סשן אחד לכל חיי התהליך: חיבורי TLS נשמרים ומשמשים שוב בין קריאות
+    session = AuthorizedSession(_creds())
+    session.mount("https://", HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=8,
+        max_retries=Retry(total=3, backoff_factor=0.3),
+    ))
+    return session
+
+def _gs_build():
+    gc = gspread.Client(auth=_creds(), session=_gs_session())
+    gc.set_timeout(GS_TIMEOUT)
+    # open() כבר מביא את ה-metadata; כל הגישה לתאים היא דרך values_*
+    # עם טווחים מלאים, כך שלא צריך עוד קריאות. _state נוצר לפי הצורך
     sh = gc.open(SPREADSHEET_NAME)
-    return sh.worksheet(WORKSHEET_NAME)
+    return gc, sh
+
+def _gs_handles():
+    # החיבור נשמר לכל חיי התהליך; את הטוקן ה-AuthorizedSession מחדש
+    # בעצמו לפני שהוא פג
+    with _gs_lock:
+        if _GS_CACHE["sh"] is None:
+            gc, sh = _gs_build()
+            _GS_CACHE.update(gc=gc, sh=sh)
+        return _GS_CACHE
+
+def gs_spreadsheet():
+    return _gs_handles()["sh"]
+
+def gs_invalidate():
+    with _gs_lock:
+        _GS_CACHE.update(gc=None, sh=None)
+
+class GSLimiter:
+    """Allow at most `rate` calls in any `per`-second window."""
+
+    def __init__(self, rate, per):
+        self.rate = rate
+        self.per = per
+        self._calls = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                t = time.monotonic()
+                while self._calls and t - self._calls[0] >= self.per:
+                    self._calls.popleft()
+                if len(self._calls) < self.rate:
+                    self._calls.append(t)
+                    return
+                wait = self.per - (t - self._calls[0])
+            time.sleep(wait)
+
+_gs_limiter = GSLimiter(GS_CALLS_PER_MINUTE, 60)
+
+def gs_call(fn, *args, **kwargs):
+    """Run a Sheets operation under the rate limiter.
+
+    429/500/503 are retried with exponential backoff and jitter; a 401
+    rebuilds the connection and retries once. fn must look up its handles
+    through the gs_* accessors so a retry picks up the fresh connection.
+    """
+    reconnected = False
+    for attempt in range(GS_MAX_ATTEMPTS):
+        _gs_limiter.acquire()
+        try:
+            return fn(*args, **kwargs)
+        except APIError as e:
+            code = e.response.status_code
+            if attempt == GS_MAX_ATTEMPTS - 1:
+                raise
+            if code == 401 and not reconnected:
+                reconnected = True
+                gs_invalidate()
+            elif code in (429, 500, 503):
+                time.sleep(min(60, 2 ** attempt + random.random()))
+            else:
+                raise
 
 # =========================
 # STATE (IN MEMORY)
 # =========================
-timers = [
-    {"running": False, "start": None, "accum": 0}
-    for _ in range(TIMER_COUNT)
-]
+# המצב בזיכרון הוא המקור; נשמר לקובץ מקומי זמן קצר אחרי כל שינוי,
+# וגיליון _state משמש רק כגיבוי שמתעדכן ברקע
+# כל קריאה/שינוי של טיימר נעשים תחת _state_lock
+@dataclass(slots=True)
+class Timer:
+    running: bool = False
+    start_monotonic: float | None = None   # לחישוב
+    start_epoch: float | None = None       # רק לשמירה ולתיעוד
+    accum: int = 0
+
+    def seconds(self, mono):
+        if self.running:
+            return self.accum + int(mono - self.start_monotonic)
+        return self.accum
+
+    def start(self, mono, epoch):
+        """Start the timer; returns False if it was already running."""
+        if self.running:
+            return False
+        self.running = True
+        self.start_monotonic = mono
+        self.start_epoch = epoch
+        return True
+
+    def stop(self, mono):
+        """Stop the timer; returns False if it was not running."""
+        if not self.running:
+            return False
+        self.accum = self.seconds(mono)
+        self.running = False
+        self.start_monotonic = None
+        self.start_epoch = None
+        return True
+
+timers = [Timer() for _ in range(TIMER_COUNT)]
 
 last_logged_hour = None
 current_workday = None
+sheet_date = None       # התאריך שכבר נכתב לשורת הכותרת בגיליון
+pending_rows = {}       # DAILY_SYNC: {hour: values} שעוד לא נכתבו
+
+_state_lock = threading.Lock()
+_mirror_dirty = False
+_mirror_event = threading.Event()   # מעיר את ת'רד הגיבוי רק כשיש שינוי
+_save_event = threading.Event()     # יש שינוי שעוד לא נשמר לקובץ
+_save_lock = threading.Lock()
+_mirror_lock = threading.Lock()     # לקיחת המצב וכתיבתו לגיליון יחד
+_started = threading.Event()
+_starting = False      # יש כבר ת'רד שמעלה את האפליקציה ברקע
+_init_lock = threading.Lock()
+
+# תשובת /api/status האחרונה, מוכנה כ-bytes
+_status_cache = {"ts": 0.0, "body": None}
+
+def _mark_dirty():
+    # caller holds _state_lock
+    global _mirror_dirty
+    _mirror_dirty = True
+    _mirror_event.set()
+    _save_event.set()
+    _status_cache["body"] = None
+
+def _state_json():
+    # caller holds _state_lock; המפתחות של pending_rows הם מספרים
+    return orjson.dumps({
+        "workday": current_workday,
+        "last_logged_hour": last_logged_hour,
+        "sheet_date": sheet_date,
+        "pending_rows": pending_rows,
+        "timers": [
+            {
+                "running": t.running,
+                "start": t.start_epoch,
+                "accum": t.accum,
+            }
+            for t in timers
+        ],
+    }, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+
+def save_state():
+    with _state_lock:
+        payload = _state_json()
+
+    with _save_lock:
+        tmp = STATE_PATH + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(payload)
+        os.replace(tmp, STATE_PATH)
+
+def save_pending():
+    if not _save_event.is_set():
+        return
+    _save_event.clear()
+    try:
+        save_state()
+    except OSError:
+        _save_event.set()
+        app.logger.exception("Failed to save state")
+
+def _state_saver():
+    while True:
+        _save_event.wait()
+        time.sleep(STATE_SAVE_DELAY)
+        save_pending()
+
+def _state_call(fn):
+    """Run a read/write of STATE_RANGE, creating the _state sheet if missing.
+
+    Sheets answers 400 for a range on a sheet that does not exist.
+    """
+    try:
+        return gs_call(fn)
+    except APIError as e:
+        if e.response.status_code != 400:
+            raise
+    gs_call(lambda: gs_spreadsheet().add_worksheet(STATE_SHEET_NAME, rows=2, cols=1))
+    return gs_call(fn)
+
+def load_state():
+    try:
+        with open(STATE_PATH, encoding="utf-8") as f:
+            raw = f.read()
+    except FileNotFoundError:
+        # אין קובץ מקומי (למשל קונטיינר חדש) – משחזרים מהגיבוי בגיליון
+        resp = _state_call(lambda: gs_spreadsheet().values_get(STATE_RANGE))
+        raw = resp.get("values", [[None]])[0][0]
+    if raw:
+        _apply_state(orjson.loads(raw))
+
+def _apply_state(st):
+    global last_logged_hour, current_workday, sheet_date, pending_rows
+
+    # ממירים את זמן ההתחלה השמור לשעון המונוטוני של התהליך הנוכחי
+    epoch, mono = time.time(), time.monotonic()
+    with _state_lock:
+        current_workday = st.get("workday")
+        last_logged_hour = st.get("last_logged_hour")
+        sheet_date = st.get("sheet_date")
+        pending_rows = {
+            int(hour): values
+            for hour, values in st.get("pending_rows", {}).items()
+        }
+        for i, saved in enumerate(st.get("timers", [])[:TIMER_COUNT]):
+            t = Timer(accum=int(saved.get("accum", 0)))
+            start = saved.get("start")
+            if isinstance(start, str):
+                # מצב שנשמר בפורמט הישן (ISO)
+                start = datetime.fromisoformat(start).timestamp()
+            if saved.get("running") and start:
+                t.start(mono - (epoch - start), start)
+            timers[i] = t
+
+def _take_mirror():
+    # caller holds _state_lock; returns the state still to be mirrored
+    global _mirror_dirty
+
+    if not _mirror_dirty:
+        return None
+    _mirror_dirty = False
+    return _state_json()
+
+def _mirror_failed():
+    global _mirror_dirty
+
+    with _state_lock:
+        _mirror_dirty = True
+        _mirror_event.set()
+
+def mirror_state():
+    # בנעילה, כדי שגיבוי ישן לא ינחת בגיליון אחרי גיבוי חדש יותר
+    with _mirror_lock:
+        with _state_lock:
+            payload = _take_mirror()
+        if payload is None:
+            return
+
+        try:
+            _state_call(lambda: gs_spreadsheet().values_update(
+                STATE_RANGE,
+                params={"valueInputOption": "RAW"},
+                body={"values": [[payload]]},
+            ))
+        except Exception:
+            _mirror_failed()
+            app.logger.exception("Failed to mirror state")
+
+def _state_mirror():
+    while True:
+        _mirror_event.wait()
+        # מחכים עוד קצת כדי לאסוף שינויים נוספים לכתיבה אחת
+        time.sleep(STATE_MIRROR_SECONDS)
+        _mirror_event.clear()
+        mirror_state()
 
 # =========================
 # HELPERS
@@ -61,18 +365,15 @@ current_workday = None
 def now():
     return datetime.now(TZ)
 
+def jsonify_fast(obj, status=200):
+    return Response(orjson.dumps(obj), status=status, mimetype="application/json")
+
+@functools.lru_cache(maxsize=4096)
 def seconds_to_hms(sec: int) -> str:
-    h = sec // 3600
-    m = (sec % 3600) // 60
-    s = sec % 60
+    m, s = divmod(max(0, int(sec)), 60)
+    h, m = divmod(m, 60)
     return f"{h:02d}:{m:02d}:{s:02d}"
 
-def effective_seconds(timer, dt):
-    sec = timer["accum"]
-    if timer["running"] and timer["start"]:
-        sec += int((dt - timer["start"]).total_seconds())
-    return sec
-
 def workday_key(dt):
     cutoff = dt.replace(hour=RESET_HOUR, minute=0, second=0, microsecond=0)
     if dt < cutoff:
@@ -82,52 +383,285 @@ def workday_key(dt):
 # =========================
 # GOOGLE SHEET WRITE
 # =========================
-def write_hour(hour):
-    WS = gs_connect()
-
-    date_str = current_workday
-    row = 7 + (hour - FIRST_HOUR)
-
-    # תאריך
-    WS.update_cell(3, 2, date_str)
-    WS.update_cell(3, 3, date_str)
-
-    values = [
-        seconds_to_hms(effective_seconds(timers[i], now()))
-        for i in range(TIMER_COUNT)
-    ]
-
-    WS.update_cell(row, 2, values[0])
-    WS.update_cell(row, 3, values[1])
-
-    return values
+def _col_letter(n):
+    s = ""
+    while n:
+        n, r = divmod(n - 1, 26)
+        s = chr(65 + r) + s
+    return s
+
+# אותיות העמודות לפי מספר (1 = A)
+_COL = [None] + [_col_letter(c) for c in range(1, 512)]
+
+def row_range(row, last_row=None):
+    last_row = row if last_row is None else last_row
+    return f"{_COL[FIRST_COL]}{row}:{_COL[FIRST_COL + TIMER_COUNT - 1]}{last_row}"
+
+def _hour_runs(hours):
+    # [8, 9, 10, 13] -> [(8, 10), (13, 13)]
+    runs = []
+    for hour in sorted(hours):
+        if runs and hour == runs[-1][1] + 1:
+            runs[-1] = (runs[-1][0], hour)
+        else:
+            runs.append((hour, hour))
+    return runs
+
+def snapshot_values():
+    # caller holds _state_lock
+    mono = time.monotonic()
+    return [seconds_to_hms(t.seconds(mono)) for t in timers]
+
+def write_rows(date_str, rows):
+    """Write {hour: values} rows of date_str in one request."""
+    global sheet_date
+
+    with _state_lock:
+        # את התאריך כותבים רק פעם אחת ביום
+        write_date = date_str != sheet_date
+
+    # תאריך (אם השתנה) + כל השעות בבקשה אחת
+    data = []
+    if write_date:
+        data.append({
+            "range": absolute_range_name(WORKSHEET_NAME, row_range(DATE_ROW)),
+            "values": [[date_str] * TIMER_COUNT],
+        })
+    # שעות רצופות נכתבות כמלבן אחד
+    for first, last in _hour_runs(rows):
+        cells = row_range(
+            FIRST_ROW + (first - FIRST_HOUR), FIRST_ROW + (last - FIRST_HOUR)
+        )
+        data.append({
+            "range": absolute_range_name(WORKSHEET_NAME, cells),
+            "values": [rows[hour] for hour in range(first, last + 1)],
+        })
+
+    gs_call(lambda: gs_spreadsheet().values_batch_update({
+        "valueInputOption": "USER_ENTERED",
+        "data": data,
+    }))
+
+    if write_date:
+        with _state_lock:
+            sheet_date = date_str
+            _mark_dirty()
+
+# כתיבות לגיליון עוברות בתור לת'רד אחד, כך שאף בקשה לא מחכה ל-Google.
+# כל פריט הוא (date_str, rows, on_fail); כל מה שממתין בתור לאותו תאריך
+# נכתב יחד בבקשה אחת
+_write_q = queue.Queue()
+
+def _write_pending(first):
+    jobs = [first]
+    while True:
+        try:
+            jobs.append(_write_q.get_nowait())
+        except queue.Empty:
+            break
+
+    by_date = {}
+    for date_str, rows, on_fail in jobs:
+        merged, callbacks = by_date.setdefault(date_str, ({}, []))
+        merged.update(rows)
+        if on_fail is not None:
+            callbacks.append(on_fail)
+
+    try:
+        for date_str, (rows, callbacks) in by_date.items():
+            try:
+                write_rows(date_str, rows)
+            except Exception:
+                # מהאחרון לראשון, כך שכל שחרור מחזיר את last_logged_hour
+                # לערך שלפני הטיק הקודם לו
+                for on_fail in reversed(callbacks):
+                    on_fail()
+                app.logger.exception("Sheet write failed")
+    finally:
+        for _ in jobs:
+            _write_q.task_done()
+
+def _sheet_writer():
+    while True:
+        _write_pending(_write_q.get())
+
+def flush_writes():
+    # מחכים שהכותב יסיים את כל התור, כולל כתיבה שכבר באמצע
+    _write_q.join()
 
 # =========================
-# AUTO HOURLY CHECK
+# SCHEDULED JOBS
 # =========================
-def hourly_check():
-    global last_logged_hour, current_workday
+scheduler = BackgroundScheduler(
+    timezone=TZ,
+    job_defaults={"coalesce": True, "max_instances": 1, "misfire_grace_time": 300},
+)
 
-    dt = now()
-    wd = workday_key(dt)
+def rollover():
+    global last_logged_hour, current_workday
 
-    # reset יומי
-    if current_workday != wd:
+    wd = workday_key(now())
+    with _state_lock:
+        # reset יומי
+        if current_workday == wd:
+            return
+        # שורות שנאספו ולא נכתבו שייכות ליום הקודם
+        leftover = _take_pending()
         current_workday = wd
         last_logged_hour = None
-        for t in timers:
-            t["running"] = False
-            t["start"] = None
-            t["accum"] = 0
-
-    # שעה עגולה
-    if (
-        dt.minute == 0
-        and FIRST_HOUR <= dt.hour <= LAST_HOUR
-        and dt.hour != last_logged_hour
-    ):
-        write_hour(dt.hour)
+        timers[:] = [Timer() for _ in range(TIMER_COUNT)]
+        _mark_dirty()
+
+    if leftover is not None:
+        _write_q.put(leftover)
+
+def hourly_job(catch_up=False):
+    global last_logged_hour
+
+    rollover()
+    dt = now()
+    if not (FIRST_HOUR <= dt.hour <= LAST_HOUR):
+        return
+
+    # תופסים את השעה לפני הכתיבה כדי שלא תירשם פעמיים.
+    # שעות שהוחמצו (למשל כשהשרת ישן) נשארות ריקות – אין לנו את הערכים שלהן
+    with _state_lock:
+        prev_hour = last_logged_hour
+        if catch_up and prev_hour is None:
+            # בעלייה אין מה להשלים אם עוד לא נרשמה אף שעה היום
+            return
+        if prev_hour is not None and prev_hour >= dt.hour:
+            return
         last_logged_hour = dt.hour
+        rows = {dt.hour: snapshot_values()}
+        _mark_dirty()
+
+        if DAILY_SYNC:
+            pending_rows.update(rows)
+            job = _take_pending() if dt.hour == LAST_HOUR else None
+        else:
+            job = (
+                current_workday,
+                rows,
+                lambda: _release_hour(dt.hour, prev_hour),
+            )
+
+    if job is not None:
+        _write_q.put(job)
+
+def _release_hour(hour, prev_hour):
+    # הכתיבה נכשלה – משחררים את השעה כדי שתיכתב שוב (למשל בעלייה הבאה)
+    global last_logged_hour
+
+    with _state_lock:
+        if last_logged_hour == hour:
+            last_logged_hour = prev_hour
+            _mark_dirty()
+
+def _take_pending():
+    # caller holds _state_lock; returns a write job for the buffered rows
+    global pending_rows
+
+    if not pending_rows:
+        return None
+    date_str, rows = current_workday, pending_rows
+    pending_rows = {}
+    _mark_dirty()
+    return date_str, rows, lambda: _restore_pending(date_str, rows)
+
+def _restore_pending(date_str, rows):
+    # הכתיבה נכשלה – מחזירים את השורות לחוצץ (אם היום עוד לא התחלף)
+    with _state_lock:
+        if current_workday != date_str:
+            app.logger.error("Dropping unsynced rows of %s", date_str)
+            return
+        for hour, values in rows.items():
+            pending_rows.setdefault(hour, values)
+        _mark_dirty()
+
+def flush_pending(wait=False):
+    """Queue the buffered rows for the writer, or write them here if wait.
+
+    At exit the write must not go through _write_q: the writer daemon could
+    take the job and be killed in the middle of the request.
+    """
+    with _state_lock:
+        job = _take_pending()
+    if job is None:
+        return
+    if not wait:
+        _write_q.put(job)
+        return
+
+    date_str, rows, on_fail = job
+    try:
+        write_rows(date_str, rows)
+    except Exception:
+        on_fail()
+        app.logger.exception("Sheet write failed")
+
+scheduler.add_job(
+    hourly_job,
+    CronTrigger(minute=0, hour=f"{FIRST_HOUR}-{LAST_HOUR}", timezone=TZ),
+)
+scheduler.add_job(rollover, CronTrigger(hour=RESET_HOUR, minute=0, timezone=TZ))
+
+def start_app():
+    with _init_lock:
+        if _started.is_set():
+            return
+        # אם הטעינה נכשלת לא מעלים כלום (בלי גיבוי ובלי scheduler),
+        # כדי לא לדרוס את הגיליון במצב ריק; ננסה שוב בבקשה הבאה
+        load_state()
+        rollover()
+        threading.Thread(target=_state_saver, daemon=True).start()
+        threading.Thread(target=_state_mirror, daemon=True).start()
+        threading.Thread(target=_sheet_writer, daemon=True).start()
+        # atexit רץ בסדר הפוך: קודם מחכים לכתיבות שבתור, אחר כך השורות
+        # שנאספו, גיבוי המצב, ובסוף שמירה לקובץ
+        atexit.register(save_pending)
+        atexit.register(mirror_state)
+        atexit.register(flush_pending, wait=True)
+        atexit.register(flush_writes)
+        # worker אחד בלבד (gunicorn.conf.py), כך שה-scheduler רץ פעם אחת
+        scheduler.start()
+        # אחרי עלייה קרה משלימים מיד את השעות שהוחמצו, בבקשה אחת
+        scheduler.add_job(hourly_job, kwargs={"catch_up": True})
+        _started.set()
+
+def _start_in_background():
+    global _starting
+
+    try:
+        start_app()
+    except Exception:
+        app.logger.exception("Startup failed")
+    finally:
+        with _init_lock:
+            _starting = False
+
+@app.before_request
+def ensure_started():
+    global _starting
+
+    if _started.is_set():
+        return
+    # העלייה (טעינת המצב, אולי מהגיבוי ב-Google) רצה תמיד בת'רד רקע אחד;
+    # אם _init_lock תפוס היא כבר רצה, ואם נכשלה מנסים שוב בבקשה הבאה
+    if _init_lock.acquire(blocking=False):
+        try:
+            spawn = not (_started.is_set() or _starting)
+            _starting = True
+        finally:
+            _init_lock.release()
+        if spawn:
+            threading.Thread(target=_start_in_background, daemon=True).start()
+
+    # / ו-/ui לא צריכים את המצב
+    if request.endpoint in ("home", "ui"):
+        return
+    if not _started.wait(STARTUP_WAIT_SECONDS):
+        return jsonify_fast({"error": "starting"}, 503)
 
 # =========================
 # ROUTES
@@ -138,63 +672,70 @@ def home():
 
 @app.route("/ui")
 def ui():
-    hourly_check()
-    return render_template("index.html")
+    return Response(_INDEX_HTML, mimetype="text/html")
 
 @app.route("/api/status")
 def status():
-    hourly_check()
-    dt = now()
-    return jsonify({
-        "workday": current_workday,
-        "timers": [
-            seconds_to_hms(effective_seconds(timers[i], dt))
-            for i in range(TIMER_COUNT)
-        ]
-    })
+    # seconds/running מאפשרים לדפדפן להמשיך לספור בעצמו בין הבדיקות
+    mono = time.monotonic()
+    with _state_lock:
+        body = _status_cache["body"]
+        if body is None or mono - _status_cache["ts"] >= STATUS_CACHE_SECONDS:
+            seconds = [t.seconds(mono) for t in timers]
+            body = orjson.dumps({
+                "workday": current_workday,
+                "timers": [seconds_to_hms(sec) for sec in seconds],
+                "seconds": seconds,
+                "running": [t.running for t in timers],
+            })
+            _status_cache.update(ts=mono, body=body)
+    return Response(body, mimetype="application/json")
 
 @app.route("/api/timer/<int:i>/start", methods=["POST"])
 def start_timer(i):
-    hourly_check()
     if 1 <= i <= TIMER_COUNT:
-        t = timers[i - 1]
-        if not t["running"]:
-            t["running"] = True
-            t["start"] = now()
-        return jsonify({"status": "started", "timer": i})
-    return jsonify({"error": "invalid timer"}), 400
+        with _state_lock:
+            if timers[i - 1].start(time.monotonic(), time.time()):
+                _mark_dirty()
+        return jsonify_fast({"status": "started", "timer": i})
+    return jsonify_fast({"error": "invalid timer"}, 400)
 
 @app.route("/api/timer/<int:i>/stop", methods=["POST"])
 def stop_timer(i):
-    hourly_check()
     if 1 <= i <= TIMER_COUNT:
-        t = timers[i - 1]
-        if t["running"]:
-            t["accum"] += int((now() - t["start"]).total_seconds())
-            t["running"] = False
-            t["start"] = None
-        return jsonify({"status": "stopped", "timer": i})
-    return jsonify({"error": "invalid timer"}), 400
+        with _state_lock:
+            if timers[i - 1].stop(time.monotonic()):
+                _mark_dirty()
+        return jsonify_fast({"status": "stopped", "timer": i})
+    return jsonify_fast({"error": "invalid timer"}, 400)
 
 @app.route("/api/timer/<int:i>/reset", methods=["POST"])
 def reset_timer(i):
-    hourly_check()
     if 1 <= i <= TIMER_COUNT:
-        timers[i - 1] = {"running": False, "start": None, "accum": 0}
-        return jsonify({"status": "reset", "timer": i})
-    return jsonify({"error": "invalid timer"}), 400
+        with _state_lock:
+            timers[i - 1] = Timer()
+            _mark_dirty()
+        return jsonify_fast({"status": "reset", "timer": i})
+    return jsonify_fast({"error": "invalid timer"}, 400)
 
 @app.route("/api/log-now", methods=["POST"])
 def log_now():
-    hourly_check()
-    if not (FIRST_HOUR <= now().hour <= LAST_HOUR):
-        return jsonify({"error": "outside logging hours"}), 400
-    values = write_hour(now().hour)
-    return jsonify({"logged": True, "values": values})
+    hour = now().hour
+    if not (FIRST_HOUR <= hour <= LAST_HOUR):
+        return jsonify_fast({"error": "outside logging hours"}, 400)
+    with _state_lock:
+        job = (current_workday, {hour: snapshot_values()}, None)
+    _write_q.put(job)
+    return jsonify_fast({"queued": True, "hour": hour})
+
+@app.route("/api/flush", methods=["POST"])
+def flush():
+    flush_pending()
+    return jsonify_fast({"queued": True})
 
 # =========================
 # MAIN
 # =========================
+# לפיתוח מקומי בלבד; בפרודקשן רץ תחת gunicorn (ראו Procfile)
 if __name__ == "__main__":
-    current_workday = workday_key(now())
     app.run(host="0.0.0.0", port=5000, debug=False)
\ No newline at end of file
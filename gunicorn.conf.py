@@ -0,0 +1,17 @@
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+
+# המצב של הטיימרים נמצא בזיכרון של התהליך, לכן worker אחד בלבד;
+# המקביליות מגיעה מה-threads. אין צורך ב-worker אסינכרוני: הכתיבות
+# לגיליון יוצאות מת'רד רקע דרך תור, וגם העלייה (שעלולה לטעון את המצב
+# מגיליון _state) רצה ברקע; בקשות API מחכות לה לכל היותר
+# STARTUP_WAIT_SECONDS
+workers = 1
+worker_class = "gthread"
+threads = 8
+
+# ת'רדי הרקע וה-scheduler עולים בבקשה הראשונה בתוך ה-worker,
+# כך שבטוח לטעון את האפליקציה מראש ב-master
+preload_app = True
+keepalive = 75